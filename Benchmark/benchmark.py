@@ -0,0 +1,624 @@
+"""
+This module contains a benchmark suite for the hot paths of the Stock, Contact, DNA,
+Permission, Tablet and Password Generator modules, with JSON baselines and regression tracking.
+
+Classes:
+    - Case: Represents a single benchmark, with the sizes it runs at and how to set it up.
+    - Result: Represents the timing samples collected for one case at one size.
+    - Comparison: Represents the outcome of comparing a result against its baseline.
+    - MemoryCase: Represents a memory benchmark that builds one object per call.
+
+Details:
+    - Every case is timed several times per size; each sample is the time taken by one full batch.
+    - Results can be saved as a JSON baseline and later runs are compared against it.
+    - A change is only flagged when it is both statistically significant (one-sided
+      Mann-Whitney U test) and larger than a relative threshold, so run-to-run noise is ignored.
+    - Memory cases measure the bytes retained per object with tracemalloc; the measurement is
+      deterministic, so only the relative threshold applies to them.
+
+Usage:
+    python benchmark.py --save              # record a baseline
+    python benchmark.py                     # compare against the baseline
+    python benchmark.py --filter portfolio  # only run matching cases
+    python benchmark.py --memory            # measure bytes per object instead of time
+    python benchmark.py --root ../old       # benchmark the modules of another checkout
+"""
+
+import argparse
+import importlib
+import json
+import math
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+# Kept in step with Instrumentation/instrumentation.py by hand: like the other modules in this
+# repository, each tool is a standalone directory that can be copied and run without the others.
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+MODULE_DIRS = ('Stock', 'Contact', 'DNA', 'Permission', 'Tablet', 'Password Generator')
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / 'baselines' / 'baseline.json'
+
+
+def load_module(name):
+    """
+    Imports one of the repository modules by name, making the module directories importable first.
+
+    Args:
+        name (str): The module name, e.g. 'stock' or 'password_generator'.
+
+    Returns:
+        module: The imported module.
+    """
+    for directory in MODULE_DIRS:
+        path = str(REPO_ROOT / directory)
+        if path not in sys.path:
+            sys.path.append(path)
+
+    return importlib.import_module(name)
+
+
+@dataclass
+class Case:
+    """
+    Represents a single benchmark case.
+
+    Attributes:
+        name (str): The name of the case, e.g. 'portfolio.value'.
+        setup (Callable): Called with a size; returns the zero-argument callable to time.
+        sizes (Tuple[int, ...]): The sizes the case runs at.
+        quick_sizes (Tuple[int, ...]): The sizes used for a quick run.
+    """
+    name: str
+    setup: Callable[[int], Callable[[], object]]
+    sizes: Tuple[int, ...]
+    quick_sizes: Tuple[int, ...]
+
+
+@dataclass
+class Result:
+    """
+    Represents the timing samples collected for one case at one size.
+
+    Attributes:
+        key (str): The case name and size, e.g. 'portfolio.value[1000]'.
+        samples (List[float]): The time taken by each batch, or the bytes per object for memory cases.
+        unit (str): 'seconds' for timing cases or 'bytes' for memory cases.
+
+    Properties:
+        median (float): The median of the samples.
+    """
+    key: str
+    samples: List[float] = field(default_factory=list)
+    unit: str = 'seconds'
+
+    @property
+    def median(self):
+        """
+        Calculates the median of the samples.
+
+        Returns:
+            float: The median of the samples.
+        """
+        return statistics.median(self.samples)
+
+
+@dataclass
+class Comparison:
+    """
+    Represents the outcome of comparing a result against its baseline.
+
+    Attributes:
+        key (str): The case name and size.
+        ratio (float): The current median divided by the baseline median.
+        p_value (float, optional): The one-sided p-value for the observed direction of change,
+            or None for deterministic memory measurements.
+        status (str): One of 'regression', 'improvement', 'unchanged' or 'new'.
+    """
+    key: str
+    ratio: float
+    p_value: Optional[float]
+    status: str
+
+
+@dataclass
+class MemoryCase:
+    """
+    Represents a memory benchmark.
+
+    Attributes:
+        name (str): The name of the case, e.g. 'memory.contact'.
+        setup (Callable): Called with a count; returns the arguments for each object and a
+            factory that builds one object from them.
+    """
+    name: str
+    setup: Callable[[int], Tuple[list, Callable[..., object]]]
+
+
+CASES: List[Case] = []
+
+MEMORY_CASES: List[MemoryCase] = []
+
+
+def case(name, sizes, quick_sizes):
+    """
+    Registers a setup function as a benchmark case.
+
+    Args:
+        name (str): The name of the case.
+        sizes (Tuple[int, ...]): The sizes the case runs at.
+        quick_sizes (Tuple[int, ...]): The sizes used for a quick run.
+
+    Returns:
+        Callable: A decorator that registers the setup function and returns it unchanged.
+    """
+    def register(setup):
+        CASES.append(Case(name, setup, tuple(sizes), tuple(quick_sizes)))
+        return setup
+
+    return register
+
+
+def memory_case(name):
+    """
+    Registers a setup function as a memory benchmark case.
+
+    Args:
+        name (str): The name of the case.
+
+    Returns:
+        Callable: A decorator that registers the setup function and returns it unchanged.
+    """
+    def register(setup):
+        MEMORY_CASES.append(MemoryCase(name, setup))
+        return setup
+
+    return register
+
+
+def _portfolio(size):
+    """
+    Builds a portfolio with the given number of positions over a shared pool of stocks.
+
+    Args:
+        size (int): The number of positions.
+
+    Returns:
+        Portfolio: The portfolio.
+    """
+    stock = load_module('stock')
+    rng = random.Random(size)
+    pool = [
+        stock.Stock(f'T{i:05d}', rng.uniform(1, 500), rng.uniform(0, 2), rng.choice((1, 2, 4, 12)))
+        for i in range(min(size, 5000))
+    ]
+    holdings = [stock.Position(pool[i % len(pool)], rng.randint(1, 1000)) for i in range(size)]
+    return stock.Portfolio(holdings)
+
+
+@case('portfolio.value', sizes=(1_000, 10_000, 100_000, 1_000_000), quick_sizes=(1_000, 10_000))
+def _portfolio_value(size):
+    portfolio = _portfolio(size)
+    return lambda: portfolio.value
+
+
+@case('portfolio.yield', sizes=(1_000, 10_000, 100_000, 1_000_000), quick_sizes=(1_000, 10_000))
+def _portfolio_yield(size):
+    portfolio = _portfolio(size)
+    return lambda: portfolio.portfolio_yield
+
+
+@case('contact.dedupe', sizes=(1_000, 10_000, 100_000), quick_sizes=(1_000,))
+def _contact_dedupe(size):
+    contact = load_module('contact')
+    rng = random.Random(size)
+    fields = [(f'First{i}', f'Last{i}', f'555-{i:07d}', f'user{i}@example.com') for i in range(size // 2 or 1)]
+    # Every contact is a separate instance, so duplicates are only found through __eq__, not identity
+    contacts = [contact.Contact(*fields[i % len(fields)]) for i in range(size)]
+    rng.shuffle(contacts)
+    return lambda: set(contacts)
+
+
+@case('dna.construct', sizes=(1_000, 10_000, 100_000), quick_sizes=(1_000,))
+def _dna_construct(size):
+    dna_base = load_module('dna_base')
+    rng = random.Random(size)
+    nucleotides = [rng.choice(('a', 'C', ' g ', 'thymine', 'Adenine')) for _ in range(size)]
+    return lambda: [dna_base.DNABase(n) for n in nucleotides]
+
+
+@case('permission.check', sizes=(1_000, 10_000, 100_000), quick_sizes=(1_000,))
+def _permission_check(size):
+    permission = load_module('permission')
+    rng = random.Random(size)
+    checks = [
+        (permission.User(f'user{i}', role), perm)
+        for i, (role, perm) in enumerate(
+            rng.choice((
+                ('admin', permission.Permission.EXEC),
+                ('manager', permission.Permission.WRITE),
+                ('user', permission.Permission.READ),
+                ('support', permission.Permission.EXEC),
+            ))
+            for _ in range(size)
+        )
+    ]
+
+    def run():
+        for user, perm in checks:
+            user._validate_permission(perm)
+
+    return run
+
+
+@case('tablet.provision', sizes=(1_000, 10_000, 100_000), quick_sizes=(1_000,))
+def _tablet_provision(size):
+    tablet_module = load_module('tablet_module')
+    rng = random.Random(size)
+    orders = [(rng.choice(('lite', 'Pro', ' max ')), rng.choice((0, 64, 256, 512))) for _ in range(size)]
+
+    def run():
+        tablets = []
+        for model, extra in orders:
+            tablet = tablet_module.Tablet(model)
+            tablet.add_storage(extra)
+            tablets.append(tablet)
+        return tablets
+
+    return run
+
+
+@case('password.generate', sizes=(1_000, 10_000), quick_sizes=(1_000,))
+def _password_generate(size):
+    password_generator = load_module('password_generator')
+    strengths = [('low', 'mid', 'high')[i % 3] for i in range(size)]
+    return lambda: [password_generator.Password(s) for s in strengths]
+
+
+@memory_case('memory.position')
+def _position_memory(count):
+    stock = load_module('stock')
+    shared = stock.Stock('AAPL', 150.0, 0.82, 4)
+    return [(shared, i) for i in range(count)], stock.Position
+
+
+@memory_case('memory.contact')
+def _contact_memory(count):
+    contact = load_module('contact')
+    args = [(f'First{i}', f'Last{i}', f'555-{i:07d}', f'user{i}@example.com') for i in range(count)]
+    return args, contact.Contact
+
+
+@memory_case('memory.dna')
+def _dna_memory(count):
+    dna_base = load_module('dna_base')
+    return [(('a', 'c', 'g', 't')[i % 4],) for i in range(count)], dna_base.DNABase
+
+
+@memory_case('memory.tablet')
+def _tablet_memory(count):
+    tablet_module = load_module('tablet_module')
+    return [((' Lite', 'Pro ', 'MAX')[i % 3],) for i in range(count)], tablet_module.Tablet
+
+
+@memory_case('memory.user')
+def _user_memory(count):
+    permission = load_module('permission')
+    roles = ('admin', 'user', 'manager', 'support')
+    return [(f'user{i}', roles[i % 4]) for i in range(count)], permission.User
+
+
+def measure_memory(setup, count=10_000):
+    """
+    Measures the memory retained per object built by a memory case.
+
+    The arguments are built before tracing starts, so only memory owned by the objects
+    themselves (and anything they allocate and keep) is counted.
+
+    Args:
+        setup (Callable): The setup function of the memory case.
+        count (int): The number of objects to build. Defaults to 10_000.
+
+    Returns:
+        float: The retained bytes per object.
+    """
+    args, factory = setup(count)
+    factory(*args[0])  # Warm up lazy class-level state
+
+    objects = [None] * count
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        for i, arguments in enumerate(args):
+            objects[i] = factory(*arguments)
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+    return (after - before) / count
+
+
+def run_memory(pattern=None, count=10_000):
+    """
+    Runs every registered memory case whose name contains the pattern.
+
+    Args:
+        pattern (str, optional): A substring that case names must contain. Defaults to None (all cases).
+        count (int): The number of objects to build per case. Defaults to 10_000.
+
+    Returns:
+        Dict[str, Result]: The retained bytes per object, keyed by case name.
+    """
+    results = {}
+
+    for bench in MEMORY_CASES:
+        if pattern and pattern not in bench.name:
+            continue
+
+        results[bench.name] = Result(bench.name, [measure_memory(bench.setup, count)], 'bytes')
+        print(f'{bench.name:<32} {results[bench.name].median:>12.1f} B/object', flush=True)
+
+    return results
+
+
+def measure(fn, repeat, min_time=0.05):
+    """
+    Times a callable, running it enough times per sample to get a stable reading.
+
+    Args:
+        fn (Callable): The zero-argument callable to time.
+        repeat (int): The number of samples to collect.
+        min_time (float): The minimum wall time per sample in seconds.
+
+    Returns:
+        List[float]: The time taken by a single call, one value per sample.
+    """
+    fn()  # Warm up caches and lazy imports
+
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        loops *= 2
+
+    samples = [elapsed / loops]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        samples.append((time.perf_counter() - start) / loops)
+
+    return samples
+
+
+def run(pattern=None, quick=False, repeat=7):
+    """
+    Runs every registered case whose name contains the pattern.
+
+    Args:
+        pattern (str, optional): A substring that case names must contain. Defaults to None (all cases).
+        quick (bool): Whether to run only the small sizes. Defaults to False.
+        repeat (int): The number of samples per case and size. Defaults to 7.
+
+    Returns:
+        Dict[str, Result]: The results keyed by case name and size.
+    """
+    results = {}
+
+    for bench in CASES:
+        if pattern and pattern not in bench.name:
+            continue
+
+        for size in bench.quick_sizes if quick else bench.sizes:
+            key = f'{bench.name}[{size}]'
+            samples = measure(bench.setup(size), repeat)
+            results[key] = Result(key, samples)
+            print(f'{key:<32} {results[key].median * 1e3:>12.3f} ms', flush=True)
+
+    return results
+
+
+def mann_whitney_p(current, baseline):
+    """
+    Calculates the one-sided p-value that the current samples are larger than the baseline samples.
+
+    Uses the normal approximation of the Mann-Whitney U statistic with a tie correction.
+
+    Args:
+        current (List[float]): The current samples.
+        baseline (List[float]): The baseline samples.
+
+    Returns:
+        float: The p-value; small values mean the current samples are significantly larger.
+    """
+    n1, n2 = len(current), len(baseline)
+    if not n1 or not n2:
+        return 1.0
+
+    ranked = sorted([(value, 0) for value in current] + [(value, 1) for value in baseline])
+    ranks = [0.0] * len(ranked)
+    tie_term = 0
+    i = 0
+    while i < len(ranked):
+        j = i
+        while j + 1 < len(ranked) and ranked[j + 1][0] == ranked[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2 + 1
+        tie_term += (j - i + 1) ** 3 - (j - i + 1)
+        i = j + 1
+
+    rank_sum = sum(rank for rank, (_, group) in zip(ranks, ranked) if group == 0)
+    u = rank_sum - n1 * (n1 + 1) / 2
+    n = n1 + n2
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return 0.5
+
+    z = (u - n1 * n2 / 2 - 0.5) / math.sqrt(variance)  # Continuity correction
+    return 1 - statistics.NormalDist().cdf(z)
+
+
+def compare(results, baseline, alpha=0.05, threshold=0.05):
+    """
+    Compares results against a baseline.
+
+    Args:
+        results (Dict[str, Result]): The current results.
+        baseline (Dict[str, Result]): The baseline results.
+        alpha (float): The significance level. Defaults to 0.05.
+        threshold (float): The minimum relative change of the median to report. Defaults to 0.05.
+
+    Returns:
+        List[Comparison]: One comparison per current result.
+    """
+    comparisons = []
+
+    for key, result in results.items():
+        reference = baseline.get(key)
+        if reference is None:
+            comparisons.append(Comparison(key, 1.0, 1.0, 'new'))
+            continue
+
+        ratio = result.median / reference.median
+
+        if result.unit == 'bytes':
+            if ratio > 1 + threshold:
+                comparisons.append(Comparison(key, ratio, None, 'regression'))
+            elif ratio < 1 - threshold:
+                comparisons.append(Comparison(key, ratio, None, 'improvement'))
+            else:
+                comparisons.append(Comparison(key, ratio, None, 'unchanged'))
+            continue
+
+        slower = mann_whitney_p(result.samples, reference.samples)
+        faster = mann_whitney_p(reference.samples, result.samples)
+
+        if slower < alpha and ratio > 1 + threshold:
+            comparisons.append(Comparison(key, ratio, slower, 'regression'))
+        elif faster < alpha and ratio < 1 - threshold:
+            comparisons.append(Comparison(key, ratio, faster, 'improvement'))
+        else:
+            comparisons.append(Comparison(key, ratio, min(slower, faster), 'unchanged'))
+
+    return comparisons
+
+
+def save_baseline(results, path=DEFAULT_BASELINE):
+    """
+    Saves results as a JSON baseline, merging them into any results already stored there.
+
+    Args:
+        results (Dict[str, Result]): The results to save.
+        path (Path): The baseline file. Defaults to DEFAULT_BASELINE.
+    """
+    path = Path(path)
+    stored = load_baseline(path) if path.exists() else {}
+    stored.update(results)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    document = {
+        'meta': {
+            'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'machine': platform.machine(),
+            'platform': platform.platform(),
+        },
+        'results': {key: asdict(result) for key, result in sorted(stored.items())},
+    }
+    path.write_text(json.dumps(document, indent=2) + '\n')
+
+
+def load_baseline(path=DEFAULT_BASELINE):
+    """
+    Loads a JSON baseline.
+
+    Args:
+        path (Path): The baseline file. Defaults to DEFAULT_BASELINE.
+
+    Returns:
+        Dict[str, Result]: The baseline results keyed by case name and size.
+    """
+    document = json.loads(Path(path).read_text())
+    return {key: Result(**value) for key, value in document['results'].items()}
+
+
+def report(comparisons):
+    """
+    Prints a comparison table.
+
+    Args:
+        comparisons (List[Comparison]): The comparisons to print.
+    """
+    print()
+    print(f'{"case":<32} {"change":>9} {"p":>8}  status')
+    for comparison in comparisons:
+        change = f'{(comparison.ratio - 1) * 100:+.1f}%'
+        p_value = '-' if comparison.p_value is None else f'{comparison.p_value:.4f}'
+        print(f'{comparison.key:<32} {change:>9} {p_value:>8}  {comparison.status}')
+
+
+def main(argv=None):
+    """
+    Runs the benchmark suite from the command line.
+
+    Args:
+        argv (List[str], optional): The command-line arguments. Defaults to sys.argv.
+
+    Returns:
+        int: 1 if any regression was found, 0 otherwise.
+    """
+    parser = argparse.ArgumentParser(description='Benchmark the hot paths of every module.')
+    parser.add_argument('--filter', help='only run cases whose name contains this text')
+    parser.add_argument('--quick', action='store_true', help='only run the small sizes')
+    parser.add_argument('--memory', action='store_true', help='measure bytes per object instead of time')
+    parser.add_argument('--repeat', type=int, default=7, help='samples per case and size (default: 7)')
+    parser.add_argument('--root', type=Path,
+                        help='benchmark the modules of another checkout, e.g. a git worktree of an older commit')
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE, help='baseline JSON file')
+    parser.add_argument('--save', action='store_true', help='save the results as the baseline')
+    parser.add_argument('--alpha', type=float, default=0.05, help='significance level (default: 0.05)')
+    parser.add_argument('--threshold', type=float, default=0.05,
+                        help='minimum relative change to flag (default: 0.05)')
+    args = parser.parse_args(argv)
+
+    if args.root is not None:
+        # Put the other checkout first so its modules shadow the ones next to this file
+        for directory in reversed(MODULE_DIRS):
+            sys.path.insert(0, str(args.root.resolve() / directory))
+
+    if args.memory:
+        results = run_memory(args.filter)
+    else:
+        results = run(args.filter, args.quick, args.repeat)
+
+    if args.save:
+        save_baseline(results, args.baseline)
+        print(f'\nSaved baseline to {args.baseline}')
+        return 0
+
+    if not args.baseline.exists():
+        print(f'\nNo baseline at {args.baseline}; run with --save to create one')
+        return 0
+
+    comparisons = compare(results, load_baseline(args.baseline), args.alpha, args.threshold)
+    report(comparisons)
+    return int(any(c.status == 'regression' for c in comparisons))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
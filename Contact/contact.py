@@ -34,6 +34,9 @@ class Contact:
             Static method to obfuscate half of a given text with asterisks.
         
     """
+
+    __slots__ = ('_first_name', '_last_name', '_phone', '_email', '_display_mode', '__weakref__')
+
     def __init__(self, first_name, last_name, phone=None, email=None, display_mode='masked'):
         """
         Initializes a contact with the specified information.
@@ -18,11 +18,27 @@ class DNABase:
         
         get_base():
             Returns the current DNA base.
+
+        shared(nucleotide):
+            Class method returning the shared, read-only instance for a nucleotide.
         
         __repr__():
             Provides a string representation of the class instance.
     """
 
+    __slots__ = ('_base', '__weakref__')
+
+    _STANDARD_NAMES = {
+        'a': 'adenine', 'adenine': 'adenine',
+        'c': 'cytosine', 'cytosine': 'cytosine',
+        'g': 'guanine', 'guanine': 'guanine',
+        't': 'thymine', 'thymine': 'thymine',
+    }
+
+    _shared = {}
+
+    _read_only = False  # True for shared instances, whose base can only be set on creation
+
     def __init__(self, nucleotide):
         """
         Initializes a DNABase instance with a specified nucleotide.
@@ -46,14 +62,7 @@ class DNABase:
         Returns:
             str: The standardized name of the DNA nucleotide if valid, False otherwise.
         """
-        allowed = [('a', 'adenine'), ('c', 'cytosine'),
-                   ('g', 'guanine'), ('t', 'thymine')]
-
-        for b in allowed:
-            if base.lower().strip() in b:
-                return b[1]
-
-        return False
+        return DNABase._STANDARD_NAMES.get(base.lower().strip(), False)
 
     def set_base(self, base):
         """
@@ -63,8 +72,12 @@ class DNABase:
             base (str): The base to set.
 
         Raises:
+            AttributeError: If this is a shared instance whose base has already been set.
             ValueError: If the base is not a recognized DNA nucleotide.
         """
+        if self._read_only and hasattr(self, '_base'):
+            raise AttributeError(f"{type(self).__name__} is shared and cannot be modified")
+
         valid_base = self._validate_and_standardize(base)
 
         if valid_base:
@@ -83,6 +96,35 @@ class DNABase:
 
     base = property(fget=get_base, fset=set_base)
 
+    @classmethod
+    def shared(cls, nucleotide):
+        """
+        Returns the shared instance for a nucleotide, creating it on first use.
+
+        There is a single shared instance per nucleotide, so large sequences can reference
+        four objects instead of allocating one per position. Shared instances are read-only.
+
+        Args:
+            nucleotide (str): The DNA nucleotide.
+
+        Returns:
+            SharedDNABase: The shared instance for the standardized nucleotide.
+
+        Raises:
+            ValueError: If the nucleotide is not a recognized DNA nucleotide.
+        """
+        valid_base = cls._validate_and_standardize(nucleotide)
+
+        if not valid_base:
+            raise ValueError(f"{nucleotide} is not a recognized DNA nucleotide")
+
+        instance = cls._shared.get(valid_base)
+        if instance is None:
+            # setdefault keeps the first stored instance if another thread created one meanwhile
+            instance = cls._shared.setdefault(valid_base, SharedDNABase(valid_base))
+
+        return instance
+
     def __repr__(self):
         """
         Provides a string representation of the DNABase instance.
@@ -91,3 +133,25 @@ class DNABase:
             str: A string representation with the nucleotide name.
         """
         return f"{type(self).__name__}(nucleotide='{self.base}')"
+
+
+class SharedDNABase(DNABase):
+    """
+    A read-only DNABase returned by DNABase.shared().
+
+    Its base is set once on creation; setting it again raises an AttributeError,
+    since the same instance is shared by every caller. It is represented as a DNABase.
+    """
+
+    __slots__ = ()
+
+    _read_only = True
+
+    def __repr__(self):
+        """
+        Provides the same string representation as a DNABase with this nucleotide.
+
+        Returns:
+            str: A string representation with the nucleotide name.
+        """
+        return f"DNABase(nucleotide='{self.base}')"
@@ -0,0 +1,496 @@
+"""
+This module contains a pluggable instrumentation layer for the hot-path entry points of every module,
+recording call counts, cumulative time and latency histograms, plus an optional sampling profiler.
+
+Classes:
+    - CallStats: Represents the call count, cumulative time and latency histogram of one entry point.
+    - SamplingProfiler: Periodically samples the stacks of running threads to find where time is spent.
+    - Instrumentation: Installs timing wrappers on entry points and exports snapshots of their stats.
+
+Details:
+    - Nothing is wrapped until install() or instrument() is called, and uninstall() restores the
+      original attributes, so a disabled Instrumentation costs nothing on the hot path.
+    - Properties are instrumented through their getter, and properties built from an instrumented
+      method (e.g. DNABase.base from set_base) are rebuilt so both routes are recorded.
+    - Snapshots are plain dictionaries that can be written to a JSON file or passed to a callback.
+"""
+
+import importlib
+import json
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from functools import wraps
+from pathlib import Path
+
+# Kept in step with Benchmark/benchmark.py by hand: like the other modules in this repository,
+# each tool is a standalone directory that can be copied and run without the others.
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+MODULE_DIRS = ('Stock', 'Contact', 'DNA', 'Permission', 'Tablet', 'Password Generator')
+
+DEFAULT_TARGETS = (
+    ('stock', 'Portfolio', 'value'),
+    ('contact', 'Contact', '__eq__'),
+    ('contact', 'Contact', '__hash__'),
+    ('dna_base', 'DNABase', 'set_base'),
+    ('permission', 'BaseUser', '_validate_permission'),
+    ('permission', 'BaseUser', 'read'),
+    ('permission', 'BaseUser', 'write'),
+    ('permission', 'BaseUser', 'execute'),
+    ('tablet_module', 'Tablet', 'add_storage'),
+    ('password_generator', 'Password', '_generate'),
+)
+
+HISTOGRAM_BUCKETS = 32  # Bucket i holds latencies below 2 ** (i + 10) ns; the last bucket is open-ended
+
+
+def load_module(name):
+    """
+    Imports one of the repository modules by name, making the module directories importable first.
+
+    Args:
+        name (str): The module name, e.g. 'stock' or 'password_generator'.
+
+    Returns:
+        module: The imported module.
+    """
+    for directory in MODULE_DIRS:
+        path = str(REPO_ROOT / directory)
+        if path not in sys.path:
+            sys.path.append(path)
+
+    return importlib.import_module(name)
+
+
+class CallStats:
+    """
+    Represents the call count, cumulative time and latency histogram of one entry point.
+
+    Attributes:
+        name (str): The name of the entry point, e.g. 'Portfolio.value'.
+        count (int): The number of calls.
+        errors (int): The number of calls that raised an exception.
+        total_ns (int): The cumulative time spent in the entry point in nanoseconds.
+        max_ns (int): The slowest call in nanoseconds.
+        histogram (list): Call counts per power-of-two latency bucket, starting at 1024 ns.
+    """
+
+    def __init__(self, name):
+        """
+        Initializes empty stats for an entry point.
+
+        Args:
+            name (str): The name of the entry point.
+        """
+        self.name = name
+        self.count = 0
+        self.errors = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.histogram = [0] * HISTOGRAM_BUCKETS
+        self._lock = threading.Lock()
+
+    def record(self, elapsed_ns, failed=False):
+        """
+        Records a single call.
+
+        Args:
+            elapsed_ns (int): The duration of the call in nanoseconds.
+            failed (bool): Whether the call raised an exception. Defaults to False.
+        """
+        bucket = min(max(elapsed_ns.bit_length() - 10, 0), HISTOGRAM_BUCKETS - 1)
+
+        with self._lock:
+            self.count += 1
+            self.errors += failed
+            self.total_ns += elapsed_ns
+            self.histogram[bucket] += 1
+            if elapsed_ns > self.max_ns:
+                self.max_ns = elapsed_ns
+
+    def reset(self):
+        """
+        Clears the stats in place, so calls being recorded concurrently are not lost into a stale object.
+        """
+        with self._lock:
+            self.count = 0
+            self.errors = 0
+            self.total_ns = 0
+            self.max_ns = 0
+            self.histogram = [0] * HISTOGRAM_BUCKETS
+
+    def as_dict(self):
+        """
+        Returns the stats as a plain dictionary.
+
+        Returns:
+            dict: The stats, with the histogram keyed by each bucket's upper bound in nanoseconds.
+        """
+        with self._lock:
+            return {
+                'count': self.count,
+                'errors': self.errors,
+                'total_ns': self.total_ns,
+                'mean_ns': self.total_ns // self.count if self.count else 0,
+                'max_ns': self.max_ns,
+                'histogram': {
+                    ('inf' if i == HISTOGRAM_BUCKETS - 1 else str(2 ** (i + 10))): n
+                    for i, n in enumerate(self.histogram) if n
+                },
+            }
+
+    def __repr__(self):
+        """
+        Provides a string representation of the stats.
+
+        Returns:
+            str: A string with the name, call count and cumulative time.
+        """
+        return f"CallStats(name='{self.name}', count={self.count}, total_ms={self.total_ns / 1e6:.3f})"
+
+
+class SamplingProfiler:
+    """
+    Periodically samples the stacks of all other threads from a background thread.
+
+    Attributes:
+        interval (float): The time between samples in seconds.
+        samples (int): The number of samples taken.
+        self_counts (Counter): How often each function was the innermost frame of a sample.
+        total_counts (Counter): How often each function appeared anywhere in a sample.
+    """
+
+    def __init__(self, interval=0.005):
+        """
+        Initializes a stopped profiler.
+
+        Args:
+            interval (float): The time between samples in seconds. Defaults to 0.005.
+        """
+        self.interval = interval
+        self.samples = 0
+        self.self_counts = Counter()
+        self.total_counts = Counter()
+        self._lock = threading.Lock()  # Guards the counters against reads while sampling
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """
+        Starts sampling in a daemon thread. Does nothing if the profiler is already running.
+        """
+        if self._thread is not None:
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops sampling and waits for the sampling thread to exit.
+        """
+        if self._thread is None:
+            return
+
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        """
+        Takes samples until stopped.
+        """
+        own_id = threading.get_ident()
+
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+
+                innermost = self._label(frame)
+                stack = set()
+                while frame is not None:
+                    stack.add(self._label(frame))
+                    frame = frame.f_back
+
+                with self._lock:
+                    self.samples += 1
+                    self.self_counts[innermost] += 1
+                    self.total_counts.update(stack)
+
+    @staticmethod
+    def _label(frame):
+        """
+        Builds a label identifying the function a frame belongs to.
+
+        Args:
+            frame (frame): The stack frame.
+
+        Returns:
+            str: The label, formatted as 'file:line(function)'.
+        """
+        code = frame.f_code
+        return f'{Path(code.co_filename).name}:{code.co_firstlineno}({code.co_name})'
+
+    def top(self, limit=20):
+        """
+        Returns the functions that appeared in the most samples.
+
+        Args:
+            limit (int): The maximum number of functions to return. Defaults to 20.
+
+        Returns:
+            dict: The sample count, and the busiest functions by self and total samples.
+        """
+        with self._lock:
+            samples = self.samples
+            self_counts = self.self_counts.copy()
+            total_counts = self.total_counts.copy()
+
+        return {
+            'samples': samples,
+            'interval': self.interval,
+            'self': dict(self_counts.most_common(limit)),
+            'total': dict(total_counts.most_common(limit)),
+        }
+
+    def clear(self):
+        """
+        Discards the samples taken so far.
+        """
+        with self._lock:
+            self.samples = 0
+            self.self_counts.clear()
+            self.total_counts.clear()
+
+
+class Instrumentation:
+    """
+    Installs timing wrappers on entry points and exports snapshots of their stats.
+
+    Attributes:
+        stats (dict): The CallStats of every instrumented entry point, keyed by name.
+        profiler (SamplingProfiler): The sampling profiler, or None if it was never started.
+
+    Methods:
+        install(targets):
+            Instruments the default entry points of every module, or the given targets.
+
+        instrument(cls, name):
+            Instruments a single method or property of a class.
+
+        uninstall():
+            Restores every instrumented attribute.
+
+        start_profiler(interval) / stop_profiler():
+            Starts and stops the optional sampling profiler.
+
+        snapshot() / export(path, callback) / reset():
+            Read, publish and clear the collected stats.
+    """
+
+    def __init__(self):
+        """
+        Initializes an instrumentation layer with nothing instrumented.
+        """
+        self.stats = {}
+        self.profiler = None
+        self._patches = []
+        self._instrumented = set()
+
+    def install(self, targets=DEFAULT_TARGETS):
+        """
+        Instruments a set of entry points.
+
+        Args:
+            targets (Iterable[Tuple[str, str, str]]): (module, class, attribute) triples to instrument.
+                Defaults to DEFAULT_TARGETS, the hot paths of every module.
+
+        Returns:
+            Instrumentation: This instance, so calls can be chained.
+        """
+        for module_name, class_name, name in targets:
+            self.instrument(getattr(load_module(module_name), class_name), name)
+
+        return self
+
+    def instrument(self, cls, name):
+        """
+        Instruments a single method or property defined on a class.
+
+        Attributes this instance has already instrumented are skipped, so calling
+        install() twice does not wrap or count anything twice.
+
+        Args:
+            cls (type): The class that defines the attribute.
+            name (str): The name of the method or property.
+
+        Raises:
+            AttributeError: If the class does not define the attribute itself.
+            TypeError: If the attribute is neither a function nor a property.
+        """
+        if name not in vars(cls):
+            raise AttributeError(f'{cls.__name__} does not define {name}')
+
+        if (cls, name) in self._instrumented:
+            return
+
+        label = f'{cls.__name__}.{name}'
+        original = vars(cls)[name]
+
+        if not isinstance(original, property) and not callable(original):
+            raise TypeError(f'{label} is not a method or property')
+
+        self._instrumented.add((cls, name))
+
+        if isinstance(original, property):
+            setattr(cls, name, original.getter(self._wrap(original.fget, label)))
+            self._patches.append((cls, name, original))
+            return
+
+        wrapped = self._wrap(original, label)
+        setattr(cls, name, wrapped)
+        self._patches.append((cls, name, original))
+
+        # Properties built directly from the method, e.g. property(fset=set_base), keep a
+        # reference to the original function and must be rebuilt to go through the wrapper.
+        for attr, value in list(vars(cls).items()):
+            if isinstance(value, property) and original in (value.fget, value.fset, value.fdel):
+                rebuilt = property(
+                    wrapped if value.fget is original else value.fget,
+                    wrapped if value.fset is original else value.fset,
+                    wrapped if value.fdel is original else value.fdel,
+                    value.__doc__,
+                )
+                setattr(cls, attr, rebuilt)
+                self._patches.append((cls, attr, value))
+
+    def _wrap(self, func, label):
+        """
+        Wraps a function so every call is recorded in the stats for the label.
+
+        Args:
+            func (Callable): The function to wrap.
+            label (str): The name of the entry point.
+
+        Returns:
+            Callable: The wrapper.
+        """
+        stats = self.stats.setdefault(label, CallStats(label))
+        clock = time.perf_counter_ns
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                result = func(*args, **kwargs)
+            except BaseException:
+                stats.record(clock() - start, failed=True)
+                raise
+            stats.record(clock() - start)
+            return result
+
+        return wrapper
+
+    def uninstall(self):
+        """
+        Restores every instrumented attribute to its original value. The collected stats are kept.
+        """
+        while self._patches:
+            cls, name, original = self._patches.pop()
+            setattr(cls, name, original)
+
+        self._instrumented.clear()
+
+    def start_profiler(self, interval=0.005):
+        """
+        Starts the sampling profiler.
+
+        Args:
+            interval (float): The time between samples in seconds. Defaults to 0.005.
+
+        Returns:
+            SamplingProfiler: The running profiler.
+        """
+        if self.profiler is None:
+            self.profiler = SamplingProfiler(interval)
+
+        self.profiler.start()
+        return self.profiler
+
+    def stop_profiler(self):
+        """
+        Stops the sampling profiler if it is running.
+        """
+        if self.profiler is not None:
+            self.profiler.stop()
+
+    def snapshot(self):
+        """
+        Returns the current stats.
+
+        Returns:
+            dict: The time of the snapshot, the stats of every entry point, and the
+                profiler's busiest functions if the profiler was started.
+        """
+        snapshot = {
+            'time': datetime.now(timezone.utc).isoformat(timespec='milliseconds'),
+            'calls': {name: stats.as_dict() for name, stats in sorted(self.stats.items())},
+        }
+
+        if self.profiler is not None:
+            snapshot['profile'] = self.profiler.top()
+
+        return snapshot
+
+    def export(self, path=None, callback=None):
+        """
+        Takes a snapshot and publishes it.
+
+        Args:
+            path (str or Path, optional): A file to append the snapshot to as one line of JSON.
+            callback (Callable, optional): A function called with the snapshot dictionary.
+
+        Returns:
+            dict: The snapshot.
+        """
+        snapshot = self.snapshot()
+
+        if path is not None:
+            with open(path, 'a') as f:
+                f.write(json.dumps(snapshot) + '\n')
+
+        if callback is not None:
+            callback(snapshot)
+
+        return snapshot
+
+    def reset(self):
+        """
+        Clears the collected stats and profiler samples, keeping the wrappers installed.
+        """
+        for stats in self.stats.values():
+            stats.reset()
+
+        if self.profiler is not None:
+            self.profiler.clear()
+
+    def __enter__(self):
+        """
+        Returns this instance for use as a context manager.
+
+        Returns:
+            Instrumentation: This instance.
+        """
+        return self
+
+    def __exit__(self, *exc_info):
+        """
+        Stops the profiler and uninstalls every wrapper when leaving the context.
+        """
+        self.stop_profiler()
+        self.uninstall()
@@ -0,0 +1,494 @@
+"""
+This module contains an asynchronous, batched audit log for the permission checks and file
+operations of BaseUser, together with an index for querying the audit files.
+
+Classes:
+    - AuditLog: Buffers audit events in a bounded queue and writes them in batches from a background thread.
+    - AuditIndex: Indexes audit files by user and path, and queries them.
+
+Details:
+    - Recording an event only puts a tuple on a bounded queue; when the queue is full the event is
+      dropped and counted instead of blocking the caller.
+    - Events are written as JSON lines to append-only segment files (audit-000001.jsonl, ...). A new
+      segment is started each time a log is opened and when the current one reaches max_bytes,
+      and the oldest segments are deleted when there are more than max_files.
+    - Each event records the time, user, role, action, permission, path, outcome and duration.
+
+Usage:
+    python audit.py audit/ --user alice        # events of one user
+    python audit.py audit/ --path script.py    # events on one file
+"""
+
+import argparse
+import json
+import queue
+import sys
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+SEGMENT_PATTERN = 'audit-*.jsonl'
+
+FIELDS = ('time', 'user', 'role', 'action', 'permission', 'path', 'outcome', 'duration_ns')
+
+
+def _segment_name(number):
+    """
+    Builds the file name of a segment.
+
+    Args:
+        number (int): The segment number.
+
+    Returns:
+        str: The file name, e.g. 'audit-000001.jsonl'.
+    """
+    return f'audit-{number:06d}.jsonl'
+
+
+def _segments(directory):
+    """
+    Lists the segment files in a directory, oldest first.
+
+    Args:
+        directory (Path): The audit directory.
+
+    Returns:
+        List[Path]: The segment files.
+    """
+    return sorted(Path(directory).glob(SEGMENT_PATTERN))
+
+
+class AuditLog:
+    """
+    Buffers audit events in a bounded queue and writes them in batches from a background thread.
+
+    Attributes:
+        directory (Path): The directory the segment files are written to.
+        max_bytes (int): The size at which a new segment is started.
+        max_files (int): The maximum number of segments to keep, or None to keep all of them.
+        batch_size (int): The maximum number of events written at once.
+        flush_interval (float): The longest time in seconds an event waits before it is written.
+        written (int): The number of events written.
+        dropped (int): The number of events dropped because the queue was full or the log was closed.
+        failed (int): The number of events lost because their batch could not be written.
+        batches (int): The number of batches written.
+        last_error (Exception): The last error raised while writing a batch, or None.
+
+    Methods:
+        record(user, role, action, permission, path, outcome, duration_ns):
+            Queues an event without blocking.
+
+        attach(target):
+            Sets this log as the audit_log of a class, e.g. BaseUser, until the log is closed.
+
+        flush():
+            Waits until every queued event has been written.
+
+        close():
+            Writes the remaining events and stops the background thread.
+    """
+
+    _STOP = object()
+
+    def __init__(self, directory='audit', max_bytes=10 * 1024 * 1024, max_files=None,
+                 queue_size=10_000, batch_size=512, flush_interval=0.5):
+        """
+        Initializes an audit log and starts its background writer.
+
+        Args:
+            directory (str or Path): The directory to write segment files to. Defaults to 'audit'.
+            max_bytes (int): The size at which a new segment is started. Defaults to 10 MiB.
+            max_files (int, optional): The maximum number of segments to keep. Defaults to None (keep all).
+            queue_size (int): The maximum number of events buffered in memory. Defaults to 10,000.
+            batch_size (int): The maximum number of events written at once. Defaults to 512.
+            flush_interval (float): The longest time in seconds an event waits before it is written.
+                Defaults to 0.5.
+        """
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+        self.last_error = None
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._drop_lock = threading.Lock()
+        self._closed = False
+        self._attached = []
+        self._file = None
+        self._segment = 0
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        existing = _segments(self.directory)
+        if existing:
+            self._segment = int(existing[-1].stem.split('-')[1])
+        # Always start a new segment, so a line left half-written by a crash is never appended to
+        self._open_segment()
+
+        self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+        self._thread.start()
+
+    def record(self, user, role, action, permission, path, outcome, duration_ns):
+        """
+        Queues an audit event without blocking.
+
+        The event is dropped and counted if the queue is full or the log has been closed.
+
+        Args:
+            user (str): The name of the user.
+            role (str or int): The role of the user.
+            action (str): The action, e.g. 'check', 'read', 'write' or 'execute'.
+            permission (str): The name of the permission involved.
+            path (str, optional): The file involved, if any.
+            outcome (str): The outcome, e.g. 'allowed', 'denied', 'ok' or 'error'.
+            duration_ns (int): The duration of the action in nanoseconds.
+        """
+        if self._closed:
+            self._count_dropped()
+            return
+
+        try:
+            self._queue.put_nowait((time.time(), user, role, action, permission, path, outcome, duration_ns))
+        except queue.Full:
+            self._count_dropped()
+
+    def _count_dropped(self, count=1):
+        """
+        Counts dropped events.
+
+        Args:
+            count (int): The number of events dropped. Defaults to 1.
+        """
+        with self._drop_lock:
+            self.dropped += count
+
+    def attach(self, target):
+        """
+        Sets this log as the audit_log of a class until the log is closed.
+
+        Closing the log restores the class's previous audit_log, so events are not
+        sent to a closed log.
+
+        Args:
+            target (type): The class to audit, e.g. BaseUser.
+
+        Returns:
+            AuditLog: This instance, so calls can be chained.
+        """
+        self._attached.append((target, 'audit_log' in vars(target), getattr(target, 'audit_log', None)))
+        target.audit_log = self
+        return self
+
+    @property
+    def pending(self):
+        """
+        Returns the number of queued events that have not been written yet.
+
+        Returns:
+            int: The approximate number of pending events.
+        """
+        return self._queue.qsize()
+
+    def stats(self):
+        """
+        Returns the counters of the audit log.
+
+        Returns:
+            dict: The number of written, dropped, failed and pending events, and the number of batches.
+        """
+        return {
+            'written': self.written,
+            'dropped': self.dropped,
+            'failed': self.failed,
+            'pending': self.pending,
+            'batches': self.batches,
+        }
+
+    def flush(self):
+        """
+        Waits until every queued event has been written to disk.
+        """
+        self._queue.join()
+
+    def close(self):
+        """
+        Writes the remaining events, stops the background thread and closes the current segment.
+
+        Classes this log was attached to get their previous audit_log back, and
+        events recorded afterwards are dropped and counted.
+        """
+        if self._closed:
+            return
+
+        self._closed = True
+
+        for target, owned, previous in reversed(self._attached):
+            if getattr(target, 'audit_log', None) is self:
+                if owned:
+                    target.audit_log = previous
+                else:
+                    del target.audit_log
+        self._attached.clear()
+
+        self._queue.put(self._STOP)
+        self._thread.join()
+        self._file.close()
+
+        # Events from threads that checked _closed just before it was set
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+            self._queue.task_done()
+            self._count_dropped()
+
+    def _run(self):
+        """
+        Collects events into batches and writes them until stopped.
+        """
+        stopping = False
+
+        while True:
+            try:
+                if stopping:
+                    batch = [self._queue.get_nowait()]  # Drain what is left, then exit
+                else:
+                    batch = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                if stopping:
+                    return
+                continue
+
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            events = [event for event in batch if event is not self._STOP]
+            stopping = stopping or len(events) < len(batch)
+
+            try:
+                if events:
+                    self._write(events)
+            except Exception as exc:  # Keep the writer alive; the batch is lost but counted
+                self.failed += len(events)
+                self.last_error = exc
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write(self, events):
+        """
+        Writes a batch of events, first starting a new segment if the current one is full.
+
+        Args:
+            events (List[tuple]): The events to write.
+        """
+        lines = []
+        for event in events:
+            record = dict(zip(FIELDS, event))
+            if record['path'] is not None:
+                record['path'] = str(record['path'])
+            lines.append(json.dumps(record, separators=(',', ':'), default=str))
+
+        # A segment left closed by a failed rotation is retried on the next batch
+        if self._file.closed or self._file.tell() >= self.max_bytes:
+            self._file.close()
+            self._open_segment()
+
+        self._file.write(('\n'.join(lines) + '\n').encode())
+        self._file.flush()
+        self.written += len(events)
+        self.batches += 1
+
+    def _open_segment(self):
+        """
+        Opens the next segment for appending and deletes the oldest segments beyond max_files.
+        """
+        self._segment += 1
+        self._file = open(self.directory / _segment_name(self._segment), 'ab')
+
+        if self.max_files is not None:
+            for old in _segments(self.directory)[:-self.max_files]:
+                old.unlink()
+
+    def __enter__(self):
+        """
+        Returns this audit log for use as a context manager.
+
+        Returns:
+            AuditLog: This instance.
+        """
+        return self
+
+    def __exit__(self, *exc_info):
+        """
+        Closes the audit log when leaving the context.
+        """
+        self.close()
+
+
+class AuditIndex:
+    """
+    Indexes audit files by user and path, and queries them.
+
+    The index is built incrementally: refresh() only reads what was appended since the last refresh.
+    Lines that cannot be decoded, e.g. damaged by a crash, are skipped and counted.
+
+    Attributes:
+        directory (Path): The audit directory.
+        by_user (dict): Maps each user to the (segment, offset) of their events.
+        by_path (dict): Maps each path to the (segment, offset) of the events on it.
+        skipped (int): The number of lines skipped because they could not be decoded.
+
+    Methods:
+        refresh():
+            Indexes the events appended since the last refresh.
+
+        query(user, path):
+            Yields the events matching a user and/or path, oldest first.
+    """
+
+    def __init__(self, directory='audit'):
+        """
+        Initializes an index of an audit directory and builds it.
+
+        Args:
+            directory (str or Path): The audit directory. Defaults to 'audit'.
+        """
+        self.directory = Path(directory)
+        self.by_user = defaultdict(list)
+        self.by_path = defaultdict(list)
+        self.skipped = 0
+        self._offsets = {}
+        self._order = []
+        self.refresh()
+
+    def refresh(self):
+        """
+        Indexes the events appended since the last refresh and forgets deleted segments.
+        """
+        segments = [path.name for path in _segments(self.directory)]
+
+        removed = set(self._offsets) - set(segments)
+        if removed:
+            for entries in (*self.by_user.values(), *self.by_path.values()):
+                entries[:] = [entry for entry in entries if entry[0] not in removed]
+            for name in removed:
+                del self._offsets[name]
+
+        self._order = segments
+
+        for name in segments:
+            offset = self._offsets.get(name, 0)
+            with open(self.directory / name, 'rb') as f:
+                f.seek(offset)
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break  # Partially written; index it on a later refresh
+
+                    record = self._decode(line)
+                    if record is None:
+                        self.skipped += 1
+                    else:
+                        self.by_user[record['user']].append((name, offset))
+                        if record['path'] is not None:
+                            self.by_path[record['path']].append((name, offset))
+                    offset += len(line)
+
+            self._offsets[name] = offset
+
+    def query(self, user=None, path=None):
+        """
+        Yields the events matching a user and/or path, oldest first.
+
+        Args:
+            user (str, optional): Only return events of this user.
+            path (str, optional): Only return events on this path.
+
+        Yields:
+            dict: The matching events.
+        """
+        if user is None and path is None:
+            locations = [(name, None) for name in self._order]
+        elif path is None:
+            locations = self.by_user.get(user, [])
+        elif user is None:
+            locations = self.by_path.get(path, [])
+        else:
+            locations = sorted(set(self.by_user.get(user, [])) & set(self.by_path.get(path, [])))
+
+        handles = {}
+        try:
+            for name, offset in locations:
+                if name not in handles:
+                    handles[name] = open(self.directory / name, 'rb')
+                f = handles[name]
+
+                if offset is None:
+                    for line in f:
+                        record = self._decode(line) if line.endswith(b'\n') else None
+                        if record is not None:
+                            yield record
+                else:
+                    f.seek(offset)
+                    yield json.loads(f.readline())
+        finally:
+            for f in handles.values():
+                f.close()
+
+    @staticmethod
+    def _decode(line):
+        """
+        Decodes one line of an audit file.
+
+        Args:
+            line (bytes): The line, including its trailing newline.
+
+        Returns:
+            dict: The event, or None if the line is not a valid event.
+        """
+        try:
+            record = json.loads(line)
+        except ValueError:
+            return None
+
+        if not isinstance(record, dict) or 'user' not in record or 'path' not in record:
+            return None
+
+        return record
+
+
+def main(argv=None):
+    """
+    Queries an audit directory from the command line, printing matching events as JSON lines.
+
+    Args:
+        argv (List[str], optional): The command-line arguments. Defaults to sys.argv.
+
+    Returns:
+        int: The exit status.
+    """
+    parser = argparse.ArgumentParser(description='Query audit files by user and path.')
+    parser.add_argument('directory', nargs='?', default='audit', help="audit directory (default: 'audit')")
+    parser.add_argument('--user', help='only show events of this user')
+    parser.add_argument('--path', help='only show events on this path')
+    parser.add_argument('--outcome', help="only show events with this outcome, e.g. 'denied'")
+    args = parser.parse_args(argv)
+
+    for record in AuditIndex(args.directory).query(args.user, args.path):
+        if args.outcome is None or record['outcome'] == args.outcome:
+            print(json.dumps(record))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,3 +1,5 @@
+import time
+from contextlib import contextmanager
 from enum import Flag, auto
 
 
@@ -18,8 +20,14 @@ class BaseUser:
 
     Attributes:
         USER_ROLES (dict): Maps user roles to permission sets.
+        audit_log (AuditLog): Receives an event for every permission check and file operation.
+            Defaults to None (no auditing). This is a process-wide hook shared by every user:
+            set it on BaseUser (or a subclass), e.g. with AuditLog.attach(BaseUser). It cannot
+            be set on a single user, since users have no per-instance __dict__.
     """
-    
+
+    __slots__ = ()
+
     USER_ROLES = {
         'admin': Permission.READ | Permission.WRITE | Permission.EXEC,
         'user': Permission.READ,
@@ -27,6 +35,8 @@ class BaseUser:
         'support': Permission.EXEC,
     }
 
+    audit_log = None
+
     def _infer_permission(self):
         """
         Infers the permissions for a user based on their role.
@@ -49,19 +59,69 @@ class BaseUser:
 
         return permissions
 
-    def _validate_permission(self, permission):
+    def _validate_permission(self, permission, file=None):
         """
         Validates if the user has a specific permission.
 
         Args:
             permission (Permission): The permission to validate.
+            file (str, optional): The file the permission is checked for, recorded in the audit log.
 
         Raises:
             PermissionError: If the user lacks the specified permission.
         """
-        if permission not in self.permissions:
+        audit_log = self.audit_log
+
+        if audit_log is None:
+            if permission not in self.permissions:
+                raise PermissionError(f'User does not have {permission.name} permission')
+            return
+
+        start = time.perf_counter_ns()
+        allowed = permission in self.permissions
+        audit_log.record(self.name, self.user_role, 'check', permission.name, file,
+                         'allowed' if allowed else 'denied', time.perf_counter_ns() - start)
+
+        if not allowed:
             raise PermissionError(f'User does not have {permission.name} permission')
 
+    @contextmanager
+    def _audited(self, audit_log, action, permission, file):
+        """
+        Validates the permission for a file operation, then records the operation in the audit log.
+
+        The operation is recorded as 'denied' if the user lacks the permission, 'ok' if the body
+        completes, and 'error' if it raises, including a PermissionError from the filesystem.
+
+        Args:
+            audit_log (AuditLog): The audit log to record to, or None to record nothing.
+            action (str): The operation, e.g. 'read'.
+            permission (Permission): The permission the operation requires.
+            file (str): The file the operation acts on.
+
+        Raises:
+            PermissionError: If the user lacks the permission.
+        """
+        if audit_log is None:
+            self._validate_permission(permission, file)
+            yield
+            return
+
+        start = time.perf_counter_ns()
+        outcome = 'error'
+        try:
+            try:
+                self._validate_permission(permission, file)
+            except PermissionError:
+                outcome = 'denied'
+                raise
+
+            yield
+            outcome = 'ok'
+        finally:
+            audit_log.record(self.name, self.user_role, action, permission.name, file,
+                             outcome, time.perf_counter_ns() - start)
+
     def read(self, file='script.py'):
         """
         Reads the content of a file.
@@ -75,15 +135,16 @@ class BaseUser:
         Raises:
             PermissionError: If the user lacks read permission.
         """
-        self._validate_permission(Permission.READ)
-
-        with open(file) as f:
-            return f.read()
+        with self._audited(self.audit_log, 'read', Permission.READ, file):
+            with open(file) as f:
+                return f.read()
 
     def write(self, file='script.py', content=''):
         """
         Writes content to a file.
 
+        Prints a confirmation unless an audit log is attached, in which case the write is audited instead.
+
         Args:
             file (str): The filename to write to. Default is 'script.py'.
             content (str): The content to write.
@@ -91,10 +152,13 @@ class BaseUser:
         Raises:
             PermissionError: If the user lacks write permission.
         """
-        self._validate_permission(Permission.WRITE)
+        audit_log = self.audit_log
+
+        with self._audited(audit_log, 'write', Permission.WRITE, file):
+            with open(file, 'w') as f:
+                f.write(content)
 
-        with open(file, 'w') as f:
-            f.write(content)
+        if audit_log is None:
             print(f"Wrote '{content}' to {file}. ")
 
     def execute(self, file='script.py'):
@@ -107,9 +171,8 @@ class BaseUser:
         Raises:
             PermissionError: If the user lacks execute permission.
         """
-        self._validate_permission(Permission.EXEC)
-
-        exec(open(file).read())
+        with self._audited(self.audit_log, 'execute', Permission.EXEC, file):
+            exec(open(file).read())
 
     def __repr__(self):
         """
@@ -133,6 +196,8 @@ class User(BaseUser):
         permissions (Permission): The permissions inferred based on the role.
     """
 
+    __slots__ = ('name', 'user_role', 'permissions', '__weakref__')
+
     def __init__(self, name, user_role):
         """
         Initializes a new user with a name and a role, inferring permissions.
@@ -0,0 +1,236 @@
+"""
+Tests for the audit log: queue overflow, shutdown, rotation, restarts, indexing, and the
+audit events recorded by BaseUser.
+"""
+
+import os
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from audit import AuditIndex, AuditLog
+from permission import BaseUser, User
+
+
+def _record(log, user='alice', path='script.py'):
+    """
+    Records a single event with fixed fields.
+    """
+    log.record(user, 'admin', 'read', 'READ', path, 'ok', 100)
+
+
+class AuditTestCase(unittest.TestCase):
+    """
+    Gives every test a fresh audit directory.
+    """
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.directory = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def segments(self):
+        return sorted(path.name for path in self.directory.glob('audit-*.jsonl'))
+
+
+class AuditLogTest(AuditTestCase):
+
+    def test_drops_and_counts_events_when_queue_is_full(self):
+        release = threading.Event()
+        log = AuditLog(self.directory, queue_size=5, flush_interval=0.01)
+        write = log._write
+
+        def blocked_write(events):
+            release.wait()
+            write(events)
+
+        log._write = blocked_write
+        _record(log)
+        while log.pending:  # Wait for the writer to take the first event and block
+            pass
+
+        for _ in range(8):
+            _record(log)
+
+        self.assertEqual(log.dropped, 3)
+        self.assertEqual(log.pending, 5)
+
+        release.set()
+        log.close()
+        self.assertEqual(log.written, 6)
+
+    def test_close_writes_pending_events_and_stops_writer(self):
+        log = AuditLog(self.directory, flush_interval=10)
+        for _ in range(100):
+            _record(log)
+
+        log.close()
+
+        self.assertFalse(log._thread.is_alive())
+        self.assertEqual(log.written, 100)
+        self.assertEqual(log.pending, 0)
+
+    def test_stop_marker_followed_by_events(self):
+        log = AuditLog(self.directory, flush_interval=10)
+        log._queue.put(log._STOP)
+        _record(log)
+
+        log._thread.join(5)
+
+        self.assertFalse(log._thread.is_alive())
+        self.assertEqual(log.written, 1)
+        self.assertEqual(log.failed, 0)
+        log._file.close()
+
+    def test_record_after_close_is_dropped(self):
+        log = AuditLog(self.directory)
+        log.close()
+
+        _record(log)
+
+        self.assertEqual(log.stats(), {'written': 0, 'dropped': 1, 'failed': 0, 'pending': 0, 'batches': 0})
+
+    def test_failed_batch_keeps_writer_alive(self):
+        log = AuditLog(self.directory, flush_interval=0.01)
+        write = log._write
+        log._write = mock.Mock(side_effect=OSError('disk full'))
+        _record(log)
+        log.flush()
+
+        log._write = write
+        _record(log)
+        log.close()
+
+        self.assertEqual((log.written, log.failed), (1, 1))
+        self.assertIsInstance(log.last_error, OSError)
+
+    def test_path_is_serialized_as_string(self):
+        with AuditLog(self.directory) as log:
+            _record(log, path=3)
+
+        self.assertEqual(next(AuditIndex(self.directory).query())['path'], '3')
+
+    def test_rotation_prunes_oldest_segments(self):
+        with AuditLog(self.directory, max_bytes=200, max_files=2, flush_interval=0.01) as log:
+            for _ in range(10):
+                _record(log)
+                log.flush()
+
+        self.assertEqual(len(self.segments()), 2)
+        self.assertGreater(log._segment, 2)
+
+    def test_attach_is_undone_on_close(self):
+        with AuditLog(self.directory) as log:
+            log.attach(BaseUser)
+            self.assertIs(BaseUser.audit_log, log)
+
+        self.assertIsNone(BaseUser.audit_log)
+
+    def test_restart_after_partial_line(self):
+        with AuditLog(self.directory) as log:
+            _record(log, user='before')
+
+        with open(self.directory / self.segments()[-1], 'ab') as f:
+            f.write(b'{"time": 1, "user": "cra')  # A crash in the middle of a write
+
+        with AuditLog(self.directory) as log:
+            _record(log, user='after')
+
+        index = AuditIndex(self.directory)
+
+        self.assertEqual(len(self.segments()), 2)
+        self.assertEqual([e['user'] for e in index.query()], ['before', 'after'])
+        self.assertEqual(len(index.by_user['after']), 1)
+
+
+class AuditIndexTest(AuditTestCase):
+
+    def test_refresh_only_indexes_new_events(self):
+        log = AuditLog(self.directory, flush_interval=0.01)
+        _record(log, user='alice', path='a.py')
+        log.flush()
+        index = AuditIndex(self.directory)
+
+        _record(log, user='alice', path='b.py')
+        _record(log, user='bob', path='a.py')
+        log.close()
+        index.refresh()
+
+        self.assertEqual(len(index.by_user['alice']), 2)
+        self.assertEqual([e['user'] for e in index.query(path='a.py')], ['alice', 'bob'])
+        self.assertEqual([e['path'] for e in index.query(user='alice', path='b.py')], ['b.py'])
+
+    def test_refresh_forgets_deleted_segments(self):
+        with AuditLog(self.directory) as log:
+            _record(log, user='old')
+        with AuditLog(self.directory) as log:
+            _record(log, user='new')
+        index = AuditIndex(self.directory)
+
+        os.remove(self.directory / self.segments()[0])
+        index.refresh()
+
+        self.assertEqual(index.by_user['old'], [])
+        self.assertEqual([e['user'] for e in index.query()], ['new'])
+
+    def test_skips_lines_that_cannot_be_decoded(self):
+        with AuditLog(self.directory) as log:
+            _record(log)
+        with open(self.directory / self.segments()[-1], 'ab') as f:
+            f.write(b'not json\n[1, 2]\n')
+
+        index = AuditIndex(self.directory)
+
+        self.assertEqual(index.skipped, 2)
+        self.assertEqual(len(list(index.query())), 1)
+
+
+class AuditedUserTest(AuditTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.file = self.directory / 'script.py'
+        self.file.write_text('x = 1\n')
+
+    def events(self, log):
+        log.close()
+        return [(e['action'], e['outcome']) for e in AuditIndex(self.directory).query()]
+
+    def test_records_check_and_operation(self):
+        log = AuditLog(self.directory).attach(BaseUser)
+
+        User('alice', 'admin').read(self.file)
+
+        self.assertEqual(self.events(log), [('check', 'allowed'), ('read', 'ok')])
+
+    def test_role_denial_is_denied(self):
+        log = AuditLog(self.directory).attach(BaseUser)
+
+        with self.assertRaises(PermissionError):
+            User('bob', 'user').write(self.file, 'x = 2')
+
+        self.assertEqual(self.events(log), [('check', 'denied'), ('write', 'denied')])
+
+    def test_filesystem_permission_error_is_error(self):
+        log = AuditLog(self.directory).attach(BaseUser)
+
+        with mock.patch('builtins.open', side_effect=PermissionError(13, 'Permission denied')):
+            with self.assertRaises(PermissionError):
+                User('alice', 'admin').read(self.file)
+
+        self.assertEqual(self.events(log), [('check', 'allowed'), ('read', 'error')])
+
+    def test_write_prints_without_audit_log(self):
+        with mock.patch('builtins.print') as printed:
+            User('alice', 'admin').write(self.file, 'x = 2')
+
+        printed.assert_called_once()
+        self.assertEqual(self.file.read_text(), 'x = 2')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -10,6 +10,7 @@ Details:
     - Stock provides information on individual stocks and calculates the annual dividend based on the dividend and frequency.
     - Position allows comparison between different positions based on the total value.
     - Portfolio provides methods to calculate the total value and portfolio yield.
+    - Stock and Position are slotted dataclasses, so large portfolios do not carry a per-instance __dict__.
 """
 
 from dataclasses import dataclass, field
@@ -17,7 +18,7 @@ from functools import total_ordering
 from typing import List
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True, weakref_slot=True)
 class Stock:
     """
     Represents a stock with a ticker, price, dividend, and dividend frequency.
@@ -47,7 +48,7 @@ class Stock:
         return self.dividend * self.dividend_frequency
 
 
-@dataclass
+@dataclass(slots=True, weakref_slot=True)
 @total_ordering
 class Position:
     """
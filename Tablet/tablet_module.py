@@ -1,3 +1,6 @@
+import sys
+
+
 class Tablet:
     """
     Represents a tablet with a specific model, base storage, and memory capacity.
@@ -35,6 +38,8 @@ class Tablet:
             Returns a string representation of the tablet with its model, base storage, added storage, and memory.
     """
 
+    __slots__ = ('model', '_base_storage', '_memory', '_added_storage', '__weakref__')
+
     MAX_MEMORY = 1024  # Maximum storage capacity for a tablet in MB
 
     MODELS = {
@@ -63,12 +68,12 @@ class Tablet:
             ValueError: If the model name is not recognized.
         """
         model = model.lower().strip()
-        if model not in list(self.MODELS.keys()):
+        if model not in self.MODELS:
             raise ValueError("Unrecognized model")
 
         specs = self.MODELS[model]
 
-        self.model = model
+        self.model = sys.intern(model)  # Share one string per model name across all tablets
         self._base_storage = specs['base_storage']
         self._memory = specs['memory']
         self._added_storage = 0